@@ -2,13 +2,83 @@ import sys
 import random
 import os
 import csv
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
-from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QPushButton, QWidget
-from PyQt6.QtCore import Qt, QTimer, QRectF
-from PyQt6.QtGui import QPixmap, QPainter
+from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsItem, QPushButton, QWidget
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QElapsedTimer, QThread, QRect, QRectF, QPoint, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QPixmapCache
+import numpy as np
 import pygame
 
+try:
+    import numba
+except ImportError:  # Optional: falls back to the NumPy step in MultiPeepDesktopCanvas
+    numba = None
+
+# Unit velocity per direction (45-degree diagonal tilt): NE, SE, SW, NW
+DIR_VEL = ((1, -1), (1, 1), (-1, 1), (-1, -1))
+DIR_TO_VEL = np.array(DIR_VEL, dtype=np.int8)
+
+# Canvas positions and speeds are int32 fixed point with this many steps per pixel
+SUBPIXELS = 2
+
+# Random directions / direction-change intervals are drawn in bulk, this many at a time
+RNG_BUFFER_SIZE = 4096
+
+def append_row(array: np.ndarray, row) -> np.ndarray:
+    return np.concatenate([array, np.array([row], dtype=array.dtype)])
+
+# --- Movement kernel ---
+def step_peeps(positions, velocities, directions, next_change, speeds, bounds, now_ms, dir_vel,
+               rand_dirs, rand_intervals, dir_idx, interval_idx):
+    """
+    Steps every walking peep in place: timed direction change, move and
+    clamp, re-roll direction if the clamp moved the peep off a screen
+    edge. Random values are consumed from the pre-drawn buffers; returns
+    the advanced buffer indices. Only used when Numba is installed to
+    JIT-compile it; otherwise MultiPeepDesktopCanvas.step_walkers runs the
+    same rules as whole-array NumPy operations.
+    """
+    for i in range(positions.shape[0]):
+        # Random direction change
+        if now_ms >= next_change[i]:
+            directions[i] = rand_dirs[dir_idx]
+            next_change[i] = now_ms + rand_intervals[interval_idx]
+            dir_idx += 1
+            interval_idx += 1
+            velocities[i, 0] = dir_vel[directions[i], 0] * speeds[i]
+            velocities[i, 1] = dir_vel[directions[i], 1] * speeds[i]
+
+        # Move and clamp; a peep the clamp moved hit a screen edge and picks a new direction
+        bounced = False
+        for axis in range(2):
+            moved = positions[i, axis] + velocities[i, axis]
+            clamped = max(0, min(moved, bounds[i, axis]))
+            positions[i, axis] = clamped
+            if clamped != moved:
+                bounced = True
+        if bounced:
+            directions[i] = rand_dirs[dir_idx]
+            dir_idx += 1
+            velocities[i, 0] = dir_vel[directions[i], 0] * speeds[i]
+            velocities[i, 1] = dir_vel[directions[i], 1] * speeds[i]
+    return dir_idx, interval_idx
+
+if numba is not None:
+    step_peeps = numba.njit(cache=True)(step_peeps)
+
+def warm_up_step_peeps():
+    # Compiles step_peeps for the canvas array dtypes so the first tick doesn't stall
+    pairs = np.empty((0, 2), dtype=np.int32)
+    step_peeps(pairs, pairs.copy(), np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64),
+               np.empty(0, dtype=np.int32), pairs.copy(), 0, DIR_TO_VEL,
+               np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64), 0, 0)
+
+# NFO csv columns read into SpriteAnimator.sprite_table, in SpriteInfo argument order:
+# sheet_num, sprite_index, sprite_id, width, height, x_offset, y_offset, sheet_x, sheet_y
+NFO_COLUMNS = (0, 1, 2, 4, 5, 6, 7, 9, 10)
+
 # --- Sprite Data Classes ---
 class SpriteInfo:
     def __init__(self, sheet_num: int, sprite_index: int, sprite_id: int,
@@ -25,263 +95,442 @@ class SpriteInfo:
         self.sheet_y = sheet_y
 
 class SpriteFrame:
-    def __init__(self, pixmap: QPixmap = None):
-        self.pixmap = pixmap or QPixmap()
+    """
+    One scaled sprite, located by `source` inside its SpriteAtlas.
+    """
+    def __init__(self, sprite_id: int, x: int, y: int, width: int, height: int):
+        self.sprite_id = sprite_id
+        self.width = width
+        self.height = height
+        self.source = QRect(x, y, width, height)
+
+class SpriteAtlas:
+    """
+    All frames of one base sprite packed into a single pixmap, one row per
+    direction. The pixmap lives in QPixmapCache under `key` and is
+    re-rendered from the spritesheets if evicted. `image` holds the
+    worker-built atlas until the GUI thread has moved it into the cache.
+    """
+    def __init__(self, key: str, scale_factor: float, frames: List[List[SpriteFrame]], width: int, height: int):
+        self.key = key
+        self.scale_factor = scale_factor
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.image: Optional[QImage] = None
 
 # --- Refactored Sprite Animator ---
 class SpriteAnimator:
     """
-    Handles directional sprite frames and movement.
-    Direction indices: 0=N, 1=E, 2=S, 3=W
-    Supports diagonal movement (45-degree tilt)
+    Handles directional sprite frames and picks a peep's starting walk.
+    Direction indices: 0=NE, 1=SE, 2=SW, 3=NW (45-degree tilt)
+    Movement itself is stepped for all peeps by MultiPeepDesktopCanvas,
+    which writes the current direction back each tick.
     """
+    # Shared across all animators: NFO metadata, decoded sheets and frame atlases
+    sprite_table: np.ndarray = np.empty((0, len(NFO_COLUMNS)), dtype=np.int32)
+    sprite_rows: Dict[int, int] = {}  # sprite_id -> row in sprite_table
+    spritesheets: List[Optional[QImage]] = []  # indexed by sheet_num; QImage so workers can read them
+    frames_cache: Dict[Tuple[int, float], SpriteAtlas] = {}
+    # The caches above are not keyed by source, so they hold one (nfo_path, sprite_directory) pair
+    _load_paths: Optional[Tuple[str, str]] = None
+    _load_ok = False
+    _load_lock = threading.Lock()  # Peeps load on QThreadPool workers
+
     def __init__(self, scale_factor: float = 1.0):
-        self.direction_frames: Dict[int, List[SpriteFrame]] = {0: [], 1: [], 2: [], 3: []}
+        self.atlas: Optional[SpriteAtlas] = None
+        self.direction_frames: List[List[SpriteFrame]] = [[], [], [], []]
         self.current_direction = 0
         self.current_frame_index = 0
         self.frame_duration = 100
         self.last_frame_time = 0
-        self.pos_x = 0.0
-        self.pos_y = 0.0
-        self.velocity_x = 0.0
-        self.velocity_y = 0.0
+        self.start_x = 0
+        self.start_y = 0
         self.move_speed = 1.0
         self.is_moving = False
         self.next_direction_change_time = 0
         self.max_canvas_width = 0
         self.max_canvas_height = 0
-        self.sprite_details: Dict[int, SpriteInfo] = {}
-        self.spritesheets: Dict[int, QPixmap] = {}
         self.scale_factor = scale_factor
 
+    # --- Load NFO and spritesheets once for every animator ---
+    @classmethod
+    def ensure_loaded(cls, nfo_path: str, sprite_directory: str) -> bool:
+        key = (nfo_path, sprite_directory)
+        with cls._load_lock:
+            if cls._load_paths is None:
+                cls._load_paths = key
+                cls._load_ok = cls.load_sprite_info(nfo_path) and cls.load_spritesheet(sprite_directory)
+            elif cls._load_paths != key:
+                print(f"Sprites already loaded from {cls._load_paths}, not {key}")
+                return False
+            return cls._load_ok
+
     # --- Load sprite info from NFO ---
-    def load_sprite_info(self, nfo_path: str) -> bool:
+    @classmethod
+    def load_sprite_info(cls, nfo_path: str) -> bool:
         try:
-            with open(nfo_path, 'r') as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    if not row or (row[0].startswith('#')):
-                        continue
-                    if len(row) >= 11:
-                        try:
-                            sheet_num = int(row[0].strip())
-                            sprite_index = int(row[1].strip())
-                            sprite_id = int(row[2].strip())
-                            width = int(row[4].strip())
-                            height = int(row[5].strip())
-                            x_offset = int(row[6].strip())
-                            y_offset = int(row[7].strip())
-                            sheet_x = int(row[9].strip())
-                            sheet_y = int(row[10].strip())
-                            if 0 < width < 4096 and 0 < height < 4096:
-                                self.sprite_details[sprite_id] = SpriteInfo(sheet_num, sprite_index, sprite_id,
-                                                                            width, height, x_offset, y_offset,
-                                                                            sheet_x, sheet_y)
-                        except:
-                            continue
-            return len(self.sprite_details) > 0
+            table = np.loadtxt(nfo_path, delimiter=',', comments='#', usecols=NFO_COLUMNS, dtype=np.int32)
         except FileNotFoundError:
             print(f"Could not open {nfo_path}")
             return False
+        except ValueError:
+            # Short or non-numeric rows: fall back to the forgiving row-by-row parse
+            table = cls._parse_nfo_rows(nfo_path)
+        table = table.reshape(-1, len(NFO_COLUMNS))
+
+        width, height = table[:, 3], table[:, 4]
+        cls.sprite_table = table[(width > 0) & (width < 4096) & (height > 0) & (height < 4096)]
+        cls.sprite_rows = {sprite_id: row for row, sprite_id in enumerate(cls.sprite_table[:, 2].tolist())}
+        return len(cls.sprite_rows) > 0
+
+    @staticmethod
+    def _parse_nfo_rows(nfo_path: str) -> np.ndarray:
+        rows = []
+        with open(nfo_path, 'r') as file:
+            for row in csv.reader(file):
+                if not row or (row[0].startswith('#')) or len(row) < 11:
+                    continue
+                try:
+                    rows.append([int(row[col].strip()) for col in NFO_COLUMNS])
+                except ValueError:
+                    continue
+        return np.array(rows, dtype=np.int32)
+
+    @classmethod
+    def sprite_info(cls, sprite_id: int) -> Optional[SpriteInfo]:
+        row = cls.sprite_rows.get(sprite_id)
+        if row is None:
+            return None
+        return SpriteInfo(*cls.sprite_table[row].tolist())
 
     # --- Load spritesheets ---
-    def load_spritesheet(self, sprite_directory: str) -> bool:
-        sheet_numbers = {info.sheet_num for info in self.sprite_details.values()}
-        for sheet_num in sheet_numbers:
-            filename = os.path.join(sprite_directory, f"sprite_{sheet_num}.png")
-            pixmap = QPixmap(filename)
-            if pixmap.isNull():
+    @classmethod
+    def load_spritesheet(cls, sprite_directory: str) -> bool:
+        sheet_numbers = np.unique(cls.sprite_table[:, 0]).tolist()
+        if sheet_numbers and sheet_numbers[-1] >= len(cls.spritesheets):
+            # Sheet numbers are small and (nearly) contiguous, so a dense list beats a dict
+            cls.spritesheets.extend([None] * (sheet_numbers[-1] + 1 - len(cls.spritesheets)))
+        sheet_numbers = [n for n in sheet_numbers if cls.spritesheets[n] is None]
+        filenames = [os.path.join(sprite_directory, f"sprite_{sheet_num}.png") for sheet_num in sheet_numbers]
+        # Decode PNGs in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            images = list(pool.map(QImage, filenames))
+        for sheet_num, filename, image in zip(sheet_numbers, filenames, images):
+            if image.isNull():
                 print(f"Could not load spritesheet: {filename}")
                 return False
-            self.spritesheets[sheet_num] = pixmap
+            cls.spritesheets[sheet_num] = image
         return True
 
     # --- Load frames for each direction ---
-    def load_direction_frames(self, base_sprite_ids:list[int], frames_per_direction: int = 5):
+    def load_direction_frames(self, base_sprite_ids:list[int], frames_per_direction: int = 5) -> Optional[QImage]:
         """
         Assumes consecutive sprite IDs for directions:
         base_sprite_id + 0 = North
         base_sprite_id + 1 = East
         base_sprite_id + 2 = South
         base_sprite_id + 3 = West
+        Frames are packed into one SpriteAtlas per (base_sprite_id, scale_factor)
+        and shared between animators; the atlas pixmap is held by QPixmapCache.
+        Safe to call off the GUI thread: returns the atlas image while it is
+        still waiting to be inserted into QPixmapCache by the GUI thread, so
+        every peep sharing the atlas can deliver it, whichever arrives first.
         """
-        self.direction_frames = {0: [], 1: [], 2: [], 3: []}
-        ref_x_offset = ref_y_offset = 0
         base_sprite_id = random.choice(base_sprite_ids)
+        cache_key = (base_sprite_id, self.scale_factor)
+        with SpriteAnimator._load_lock:
+            atlas = SpriteAnimator.frames_cache.get(cache_key)
+            if atlas is None:
+                atlas = self.build_atlas(base_sprite_id, self.scale_factor, frames_per_direction)
+                SpriteAnimator.frames_cache[cache_key] = atlas
+            image = atlas.image
+        self.atlas = atlas
+        self.direction_frames = atlas.frames
+        self._update_max_canvas()
+        return image
+
+    @classmethod
+    def build_atlas(cls, base_sprite_id: int, scale_factor: float, frames_per_direction: int) -> SpriteAtlas:
+        sprites: List[List[Tuple[int, QImage]]] = [[], [], [], []]
         for dir_idx in range(4):
             for i in range(frames_per_direction):
                 sprite_id = base_sprite_id + dir_idx + i*4
-                if sprite_id not in self.sprite_details:
+                info = cls.sprite_info(sprite_id)
+                if info is None:
                     continue
-                info = self.sprite_details[sprite_id]
-                if info.sheet_num not in self.spritesheets:
+                if info.sheet_num >= len(cls.spritesheets) or cls.spritesheets[info.sheet_num] is None:
                     continue
-                spritesheet = self.spritesheets[info.sheet_num]
-                
-                # Create original canvas
-                canvas = QPixmap(info.width, info.height)
-                canvas.fill(Qt.GlobalColor.transparent)
-                painter = QPainter(canvas)
-                painter.drawPixmap(0, 0, spritesheet, info.sheet_x, info.sheet_y, info.width, info.height)
-                painter.end()
-                
-                # Scale the canvas if needed
-                if self.scale_factor != 1.0:
-                    scaled_width = int(info.width * self.scale_factor)
-                    scaled_height = int(info.height * self.scale_factor)
-                    canvas = canvas.scaled(scaled_width, scaled_height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                
-                self.direction_frames[dir_idx].append(SpriteFrame(canvas))
-
+                sprites[dir_idx].append((sprite_id, cls.render_sprite(sprite_id, scale_factor)))
+
+        # One cell per frame, sized to the largest frame
+        cell_width = max([p.width() for direction in sprites for _, p in direction] or [0])
+        cell_height = max([p.height() for direction in sprites for _, p in direction] or [0])
+        frames = [[SpriteFrame(sprite_id, col * cell_width, dir_idx * cell_height, p.width(), p.height())
+                   for col, (sprite_id, p) in enumerate(direction)]
+                  for dir_idx, direction in enumerate(sprites)]
+        atlas = SpriteAtlas(f"peep/{base_sprite_id}@{scale_factor}", scale_factor, frames,
+                            cell_width * frames_per_direction, cell_height * 4)
+        if cell_width and cell_height:
+            atlas.image = cls.paint_atlas(atlas, [p for direction in sprites for _, p in direction])
+        return atlas
+
+    # Atlases are painted as QImage so they can be built off the GUI thread
+    @classmethod
+    def paint_atlas(cls, atlas: SpriteAtlas, images: Optional[List[QImage]] = None) -> QImage:
+        frames = [frame for direction in atlas.frames for frame in direction]
+        if images is None:
+            images = [cls.render_sprite(frame.sprite_id, atlas.scale_factor) for frame in frames]
+        canvas = QImage(atlas.width, atlas.height, QImage.Format.Format_ARGB32_Premultiplied)
+        canvas.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(canvas)
+        for frame, image in zip(frames, images):
+            painter.drawImage(frame.source.topLeft(), image)
+        painter.end()
+        return canvas
+
+    @classmethod
+    def render_sprite(cls, sprite_id: int, scale_factor: float) -> QImage:
+        info = cls.sprite_info(sprite_id)
+        # Cut the sprite out natively; nearest-neighbour scaling keeps pixel art crisp
+        image = cls.spritesheets[info.sheet_num].copy(info.sheet_x, info.sheet_y, info.width, info.height)
+        if scale_factor != 1.0:
+            scaled_width = int(info.width * scale_factor)
+            scaled_height = int(info.height * scale_factor)
+            image = image.scaled(scaled_width, scaled_height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
+        return image
+
+    def _update_max_canvas(self):
         # Determine max canvas (scaled dimensions)
-        self.max_canvas_width = max([f.pixmap.width() for frames in self.direction_frames.values() for f in frames] or [0])
-        self.max_canvas_height = max([f.pixmap.height() for frames in self.direction_frames.values() for f in frames] or [0])
+        self.max_canvas_width = max([f.width for frames in self.direction_frames for f in frames] or [0])
+        self.max_canvas_height = max([f.height for frames in self.direction_frames for f in frames] or [0])
 
     # --- Setup movement ---
-    def setup_walking(self, screen_width: int, screen_height: int, start_x=None, start_y=None):
-        self.pos_x = float(random.randint(0, screen_width - self.max_canvas_width)) if start_x is None else start_x
-        self.pos_y = float(random.randint(0, screen_height - self.max_canvas_height)) if start_y is None else start_y
-        self.set_direction(random.randint(0, 3))
+    def setup_walking(self, screen_width: int, screen_height: int, current_time: int):
+        # Initial state only; MultiPeepDesktopCanvas.add_walker copies it into its arrays
+        self.start_x = random.randint(0, max(0, screen_width - self.max_canvas_width))
+        self.start_y = random.randint(0, max(0, screen_height - self.max_canvas_height))
+        self.current_direction = random.randint(0, 3)
         self.is_moving = True
-        self.next_direction_change_time = int(time.time()*1000) + random.randint(1000, 3000)
-
-    def set_direction(self, direction: int):
-        self.current_direction = direction
-        speed = self.move_speed
-        # 45-degree diagonal tilt mapping
-        if direction == 0:  # North-East
-            self.velocity_x, self.velocity_y = speed, -speed
-        elif direction == 1:  # South-East
-            self.velocity_x, self.velocity_y = speed, speed
-        elif direction == 2:  # South-West
-            self.velocity_x, self.velocity_y = -speed, speed
-        elif direction == 3:  # North-West
-            self.velocity_x, self.velocity_y = -speed, -speed
-
-    # --- Update animation and position ---
-    def update(self, screen_width: int, screen_height: int):
+        self.next_direction_change_time = current_time + random.randint(1000, 3000)
+
+    # --- Update animation ---
+    def update(self, current_time: int):
+        """
+        Advances the frame animation. Movement and direction changes are
+        stepped for all peeps at once by MultiPeepDesktopCanvas, which also
+        reads the clock once per tick and passes it in as `current_time` (ms).
+        """
         if not self.is_moving:
             return
 
-        current_time = int(time.time() * 1000)
-
         # Frame animation
-        frames = self.direction_frames.get(self.current_direction, [])
+        frames = self.direction_frames[self.current_direction]
         if frames and current_time - self.last_frame_time >= self.frame_duration:
             self.current_frame_index = (self.current_frame_index + 1) % len(frames)
             self.last_frame_time = current_time
 
-        # Random direction change
-        if current_time >= self.next_direction_change_time:
-            new_dir = random.choice([0, 1, 2, 3])
-            if new_dir != self.current_direction:
-                self.set_direction(new_dir)
-            self.next_direction_change_time = current_time + random.randint(1000, 3000)
-
-        # Move
-        self.pos_x += self.velocity_x
-        self.pos_y += self.velocity_y
-
-        bounced = False
-        if self.pos_x < 0 or self.pos_x > screen_width - self.max_canvas_width:
-            bounced = True
-        if self.pos_y < 0 or self.pos_y > screen_height - self.max_canvas_height:
-            bounced = True
-
-        if bounced:
-            self.set_direction(random.choice([0,1,2,3]))
-
-        self.pos_x = max(0, min(self.pos_x, screen_width - self.max_canvas_width))
-        self.pos_y = max(0, min(self.pos_y, screen_height - self.max_canvas_height))
-
-    def get_current_frame(self) -> Optional[SpriteFrame]:
-        frames = self.direction_frames.get(self.current_direction, [])
+    def get_current_frame(self) -> Optional[Tuple[QPixmap, QRect]]:
+        """
+        Returns the atlas pixmap and the source rect of the current frame in it.
+        """
+        frames = self.direction_frames[self.current_direction]
         if not frames:
             return None
-        return frames[self.current_frame_index]
-
-    def get_position(self) -> Tuple[float, float]:
-        return self.pos_x, self.pos_y
+        pixmap = QPixmapCache.find(self.atlas.key)
+        if pixmap is None:
+            # Evicted: re-render from the shared spritesheets
+            pixmap = QPixmap.fromImage(self.paint_atlas(self.atlas))
+            QPixmapCache.insert(self.atlas.key, pixmap)
+        return pixmap, frames[self.current_frame_index].source
 
 # --- Desktop Peep ---
 class DesktopPeep:
+    # One yellow placeholder per size, shared by every peep (QPixmap is implicitly shared)
+    _FALLBACK_CACHE: Dict[int, QPixmap] = {}
+
     def __init__(self, base_sprite_id: int, nfo_path: str, sprite_directory: str, scale_factor: float = 1.0):
         self.animator = SpriteAnimator(scale_factor)
-        if not self.animator.load_sprite_info(nfo_path) or not self.animator.load_spritesheet(sprite_directory):
-            # fallback
-            self.use_fallback = True
-            fallback_size = int(64 * scale_factor)
-            self.fallback_pixmap = QPixmap(fallback_size, fallback_size)
-            self.fallback_pixmap.fill(Qt.GlobalColor.yellow)
-            self.x = random.randint(0,800)
-            self.y = random.randint(0,600)
-            self.dx = random.choice([-2,-1,1,2])
-            self.dy = random.choice([-2,-1,1,2])
-        else:
-            self.use_fallback = False
-            self.animator.load_direction_frames(base_sprite_id)
-            self.animator.move_speed = 0.5
+        self.base_sprite_id = base_sprite_id
+        self.nfo_path = nfo_path
+        self.sprite_directory = sprite_directory
+        self.is_loaded = False
+        # Shown as a placeholder until load() finishes, and kept if loading fails
+        self.use_fallback = True
+        fallback_size = int(64 * scale_factor)
+        if fallback_size not in DesktopPeep._FALLBACK_CACHE:
+            DesktopPeep._FALLBACK_CACHE[fallback_size] = self._make_fallback(fallback_size)
+        self.fallback_pixmap = DesktopPeep._FALLBACK_CACHE[fallback_size]
+        self.x = random.randint(0,800)
+        self.y = random.randint(0,600)
+        self.dx = random.choice([-2,-1,1,2])
+        self.dy = random.choice([-2,-1,1,2])
+
+    @staticmethod
+    def _make_fallback(size: int) -> QPixmap:
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.GlobalColor.yellow)
+        return pixmap
+
+    def load(self) -> Optional[QImage]:
+        """
+        Loads sprite data and frames; runs on a PeepLoader worker. Returns a
+        newly built atlas image, if any, for the GUI thread to cache.
+        """
+        if not SpriteAnimator.ensure_loaded(self.nfo_path, self.sprite_directory):
+            return None
+        image = self.animator.load_direction_frames(self.base_sprite_id)
+        self.animator.move_speed = 0.5
+        self.is_loaded = True
+        return image
 
-        self.graphics_item = QGraphicsPixmapItem()
-        if self.use_fallback:
-            self.graphics_item.setPixmap(self.fallback_pixmap)
+    def setup(self, screen_width:int, screen_height:int, current_time:int):
+        if self.is_loaded:
+            self.use_fallback = False
+            self.animator.setup_walking(screen_width, screen_height, current_time)
 
-    def setup(self, screen_width:int, screen_height:int):
+    def update(self, current_time:int):
+        # Positions of walking and fallback peeps are stepped by the canvas
         if not self.use_fallback:
-            self.animator.setup_walking(screen_width, screen_height)
-        else:
-            self.graphics_item.setPos(self.x, self.y)
+            self.animator.update(current_time)
 
-    def update(self, screen_width:int, screen_height:int):
+    def current_sprite(self) -> Optional[Tuple[QPixmap, QRect]]:
         if self.use_fallback:
-            self.x += self.dx
-            self.y += self.dy
-            if self.x<0 or self.x+64>screen_width: self.dx*=-1
-            if self.y<0 or self.y+64>screen_height: self.dy*=-1
-            self.graphics_item.setPos(self.x, self.y)
+            return self.fallback_pixmap, self.fallback_pixmap.rect()
+        return self.animator.get_current_frame()
+
+# --- Peep Loader ---
+class PeepLoaderSignals(QObject):
+    loaded = pyqtSignal(object, object)  # DesktopPeep, Optional[QImage] atlas
+
+class PeepLoader(QRunnable):
+    """
+    Loads one peep's sprites on the QThreadPool so the window can paint
+    placeholders immediately. Only QImage work happens here; the canvas
+    turns the result into a QPixmap on the GUI thread.
+    """
+    def __init__(self, peep: DesktopPeep, signals: PeepLoaderSignals):
+        super().__init__()
+        self.peep = peep
+        self.signals = signals
+
+    def run(self):
+        image = None
+        try:
+            image = self.peep.load()
+        except Exception as e:
+            # Still report back, so the canvas moves the peep to the fallback path
+            print(f"Could not load peep sprites: {e}")
+        finally:
+            self.signals.loaded.emit(self.peep, image)
+
+class StepCompiler(QRunnable):
+    """
+    JIT-compiles step_peeps once on the QThreadPool, alongside the peep
+    loaders rather than ahead of them. Only started when Numba is installed.
+    """
+    def run(self):
+        warm_up_step_peeps()
+
+# --- Peep Swarm Item ---
+class PeepSwarmItem(QGraphicsItem):
+    """
+    Draws every peep in a single paint pass, so a tick costs one item
+    instead of a setPos per peep. Peeps are drawn as source rects of their
+    shared atlas pixmap. Only peeps whose position or frame changed are
+    invalidated, and painting skips peeps outside the exposed rect.
+    """
+    def __init__(self, rect: QRectF):
+        super().__init__()
+        self.rect = rect
+        self.sprites: List[Tuple[int, int, QPixmap, QRect]] = []
+        self.sprite_keys: List[Tuple[int, int, int, int, int]] = []
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self) -> QRectF:
+        return self.rect
+
+    def set_sprites(self, sprites: List[Tuple[int, int, QPixmap, QRect]]):
+        # cacheKey() is stable across QPixmapCache lookups, unlike id() of the Python wrapper
+        keys = [(x, y, pixmap.cacheKey(), source.x(), source.y()) for x, y, pixmap, source in sprites]
+        if len(keys) != len(self.sprite_keys):
+            self.update()
         else:
-            self.animator.update(screen_width, screen_height)
-            frame = self.animator.get_current_frame()
-            if frame:
-                self.graphics_item.setPixmap(frame.pixmap)
-            x, y = self.animator.get_position()
-            self.graphics_item.setPos(x, y)
+            for old_key, new_key, old, new in zip(self.sprite_keys, keys, self.sprites, sprites):
+                if old_key != new_key:
+                    self.update(QRectF(old[0], old[1], old[3].width(), old[3].height()))
+                    self.update(QRectF(new[0], new[1], new[3].width(), new[3].height()))
+        self.sprites = sprites
+        self.sprite_keys = keys
+
+    def paint(self, painter: QPainter, option, widget=None):
+        exposed = option.exposedRect
+        for x, y, pixmap, source in self.sprites:
+            if exposed.intersects(QRectF(x, y, source.width(), source.height())):
+                painter.drawPixmap(QPoint(x, y), pixmap, source)
 
 # --- Audio Manager ---
 class AudioManager:
     def __init__(self):
-        pygame.mixer.init()
+        self.ready = False  # Set once the mixer is initialised (see AudioLoader)
         self.music_playing = False
         self.is_muted = False
         self.current_volume = 0.7  # Default volume
+
+    def init_mixer(self):
+        pygame.mixer.init()
+        self.ready = True
     
     def play_music(self, music_file: str):
         try:
             if os.path.exists(music_file):
                 pygame.mixer.music.load(music_file)
                 pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-                pygame.mixer.music.set_volume(self.current_volume)
+                self.apply_volume()
                 self.music_playing = True
                 print(f"Playing background music: {music_file}")
             else:
                 print(f"Music file not found: {music_file}")
         except pygame.error as e:
             print(f"Error playing music: {e}")
+
+    def apply_volume(self):
+        if self.ready:
+            pygame.mixer.music.set_volume(0.0 if self.is_muted else self.current_volume)
     
     def toggle_mute(self):
-        if self.is_muted:
-            pygame.mixer.music.set_volume(self.current_volume)
-            self.is_muted = False
-        else:
-            pygame.mixer.music.set_volume(0.0)
-            self.is_muted = True
+        # Mute state is remembered even before the mixer is ready
+        self.is_muted = not self.is_muted
+        self.apply_volume()
         return self.is_muted
     
     def stop_music(self):
-        if self.music_playing:
+        if self.ready and self.music_playing:
             pygame.mixer.music.stop()
             self.music_playing = False
 
+# --- Audio Loader ---
+class AudioLoader(QThread):
+    """
+    Initialises the mixer and loads the music off the GUI thread so the
+    peeps can appear while the mp3 is still being decoded.
+    """
+    music_ready = pyqtSignal()
+
+    def __init__(self, audio_manager: AudioManager, music_file: str):
+        super().__init__()
+        self.audio_manager = audio_manager
+        self.music_file = music_file
+
+    def run(self):
+        try:
+            self.audio_manager.init_mixer()
+        except pygame.error as e:
+            print(f"Error initialising audio: {e}")
+            return
+        self.audio_manager.play_music(self.music_file)
+        self.music_ready.emit()
+
 # --- Control Panel Widget ---
 class ControlPanel(QWidget):
     def __init__(self, audio_manager, main_canvas):
@@ -399,9 +648,12 @@ class MultiPeepDesktopCanvas(QGraphicsView):
         self.peeps: List[DesktopPeep] = []
         self.scale_factor = scale_factor
         
-        # Initialize audio manager and start music
+        # Initialize audio manager and start music in the background
         self.audio_manager = AudioManager()
-        self.audio_manager.play_music("RollerCoaster Tycoon - Merry go round music.mp3")
+        self.audio_loader = AudioLoader(self.audio_manager, "RollerCoaster Tycoon - Merry go round music.mp3")
+        # Re-apply volume on the GUI thread in case mute was toggled while loading
+        self.audio_loader.music_ready.connect(self.audio_manager.apply_volume)
+        self.audio_loader.start()
         
         # --- Window transparency / overlay settings ---
         self.setWindowFlags(
@@ -429,15 +681,35 @@ class MultiPeepDesktopCanvas(QGraphicsView):
         self.screen_width = screen_geom.width()
         self.screen_height = screen_geom.height()
 
+        # Monotonic clock shared by all peeps, read once per tick
+        self._elapsed = QElapsedTimer()
+        self._elapsed.start()
+
         # --- Add peeps ---
+        # Peeps start as placeholders and join walkers/fallbacks once loaded
+        self.pending: List[DesktopPeep] = []
+        self.walkers: List[DesktopPeep] = []
+        self.fallbacks: List[DesktopPeep] = []
+        self.init_walker_arrays()
+        self.init_fallback_arrays()
+        self._atlas_kb = 0  # Size of all atlases handed to QPixmapCache
+        self.refill_random()
+        self.swarm = PeepSwarmItem(self.scene.sceneRect())
+        self.scene.addItem(self.swarm)
+        self.loader_signals = PeepLoaderSignals()
+        self.loader_signals.loaded.connect(self.on_peep_loaded, Qt.ConnectionType.QueuedConnection)
+        if numba is not None:
+            QThreadPool.globalInstance().start(StepCompiler())
         for _ in range(n_peeps):
             peep = DesktopPeep(base_sprite_id, nfo_path, sprite_directory, scale_factor)
             self.peeps.append(peep)
-            self.scene.addItem(peep.graphics_item)
-            peep.setup(self.screen_width, self.screen_height)
+            self.pending.append(peep)
+            QThreadPool.globalInstance().start(PeepLoader(peep, self.loader_signals))
 
         # --- Timer ---
+        # Movement is per tick, so keep a fixed ~60Hz interval but avoid coarse timer jitter
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.update_peeps)
         self.timer.start(16)
 
@@ -487,9 +759,130 @@ class MultiPeepDesktopCanvas(QGraphicsView):
         is_muted = self.audio_manager.toggle_mute()
         self.mute_button.setText("🔇" if is_muted else "🔊")
 
+    # --- Movement state as structure-of-arrays, one row per walking peep ---
+    def init_walker_arrays(self):
+        self.positions = np.empty((0, 2), dtype=np.int32)
+        self.directions = np.empty(0, dtype=np.int8)
+        self.speeds = np.empty(0, dtype=np.int32)
+        self.velocities = np.empty((0, 2), dtype=np.int32)
+        self.next_dir_change = np.empty(0, dtype=np.int64)
+        self.bounds = np.empty((0, 2), dtype=np.int32)
+
+    def add_walker(self, peep: DesktopPeep):
+        a = peep.animator
+        speed = round(a.move_speed * SUBPIXELS)
+        bounds = (max(0, self.screen_width - a.max_canvas_width) * SUBPIXELS,
+                  max(0, self.screen_height - a.max_canvas_height) * SUBPIXELS)
+        self.walkers.append(peep)
+        self.positions = append_row(self.positions, (a.start_x * SUBPIXELS, a.start_y * SUBPIXELS))
+        self.directions = append_row(self.directions, a.current_direction)
+        self.speeds = append_row(self.speeds, speed)
+        self.velocities = append_row(self.velocities, [v * speed for v in DIR_VEL[a.current_direction]])
+        self.next_dir_change = append_row(self.next_dir_change, a.next_direction_change_time)
+        self.bounds = append_row(self.bounds, bounds)
+
+    def init_fallback_arrays(self):
+        self.fallback_positions = np.empty((0, 2), dtype=np.int32)
+        self.fallback_velocities = np.empty((0, 2), dtype=np.int32)
+        self.fallback_bounds = np.array([self.screen_width - 64, self.screen_height - 64], dtype=np.int32)
+
+    def add_fallback(self, peep: DesktopPeep):
+        self.fallbacks.append(peep)
+        self.fallback_positions = append_row(self.fallback_positions, (peep.x, peep.y))
+        self.fallback_velocities = append_row(self.fallback_velocities, (peep.dx, peep.dy))
+
+    def on_peep_loaded(self, peep: DesktopPeep, image: Optional[QImage]):
+        atlas = peep.animator.atlas
+        if image is not None and atlas.image is not None:
+            # First peep of this atlas to arrive: keep every loaded atlas resident
+            # unless the working set outgrows the default budget
+            self._atlas_kb += image.sizeInBytes() // 1024 + 1
+            QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 2 * self._atlas_kb))
+            QPixmapCache.insert(atlas.key, QPixmap.fromImage(image))
+            atlas.image = None
+        self.pending.remove(peep)
+        peep.setup(self.screen_width, self.screen_height, self._elapsed.elapsed())
+        if peep.use_fallback:
+            self.add_fallback(peep)
+        else:
+            self.add_walker(peep)
+
+    # --- Bulk random numbers for direction changes ---
+    def refill_random(self):
+        # A tick uses at most two directions and one interval per walker;
+        # leave room for several such ticks so large swarms don't refill every tick
+        size = max(RNG_BUFFER_SIZE, 8 * len(self.walkers))
+        self._rand_dirs = np.random.randint(0, 4, size=size, dtype=np.int8)
+        # int64 like next_dir_change, so adding the elapsed time cannot overflow
+        self._rand_intervals = np.random.randint(1000, 3001, size=size, dtype=np.int64)
+        self._dir_idx = 0
+        self._interval_idx = 0
+
+    def take_directions(self, n: int) -> np.ndarray:
+        start = self._dir_idx
+        self._dir_idx += n
+        return self._rand_dirs[start:start + n]
+
+    def take_intervals(self, n: int) -> np.ndarray:
+        start = self._interval_idx
+        self._interval_idx += n
+        return self._rand_intervals[start:start + n]
+
+    def reroll_directions(self, mask: np.ndarray):
+        self.directions[mask] = self.take_directions(np.count_nonzero(mask))
+        self.velocities[mask] = DIR_TO_VEL[self.directions[mask]] * self.speeds[mask, None]
+
+    def step_walkers(self, current_time: int):
+        if self._dir_idx + 2 * len(self.walkers) > len(self._rand_dirs):
+            self.refill_random()
+
+        if numba is not None:
+            self._dir_idx, self._interval_idx = step_peeps(
+                self.positions, self.velocities, self.directions, self.next_dir_change,
+                self.speeds, self.bounds, current_time, DIR_TO_VEL,
+                self._rand_dirs, self._rand_intervals, self._dir_idx, self._interval_idx)
+            return
+
+        # Random direction change
+        due = current_time >= self.next_dir_change
+        if due.any():
+            self.reroll_directions(due)
+            self.next_dir_change[due] = current_time + self.take_intervals(np.count_nonzero(due))
+
+        # Move and clamp; any peep the clamp moved hit a screen edge and picks a new direction
+        self.positions += self.velocities
+        clamped = np.clip(self.positions, 0, self.bounds)
+        bounced = (clamped != self.positions).any(axis=1)
+        self.positions = clamped
+        if bounced.any():
+            self.reroll_directions(bounced)
+
+    def step_fallbacks(self):
+        # Fallback peeps bounce straight off the screen edges
+        self.fallback_positions += self.fallback_velocities
+        out = (self.fallback_positions < 0) | (self.fallback_positions > self.fallback_bounds)
+        self.fallback_velocities[out] *= -1
+
     def update_peeps(self):
-        for peep in self.peeps:
-            peep.update(self.screen_width, self.screen_height)
+        now_ms = self._elapsed.elapsed()
+        if self.walkers:
+            self.step_walkers(now_ms)
+        if self.fallbacks:
+            self.step_fallbacks()
+
+        sprites = []
+        for peep, direction, (x, y) in zip(self.walkers, self.directions.tolist(),
+                                           (self.positions // SUBPIXELS).tolist()):
+            peep.animator.current_direction = direction
+            peep.update(now_ms)
+            sprite = peep.current_sprite()
+            if sprite is not None:
+                sprites.append((x, y, *sprite))
+        for peep, (x, y) in zip(self.fallbacks, self.fallback_positions.tolist()):
+            sprites.append((x, y, *peep.current_sprite()))
+        for peep in self.pending:
+            sprites.append((peep.x, peep.y, *peep.current_sprite()))
+        self.swarm.set_sprites(sprites)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Escape:
@@ -500,6 +893,9 @@ class MultiPeepDesktopCanvas(QGraphicsView):
         # Stop music and close control panel when closing the application
         if hasattr(self, 'control_panel'):
             self.control_panel.close()
+        QThreadPool.globalInstance().clear()
+        QThreadPool.globalInstance().waitForDone()
+        self.audio_loader.wait()
         self.audio_manager.stop_music()
         super().closeEvent(event)
 